@@ -1,10 +1,33 @@
+from array import array
+from random import getrandbits
+
+import numpy as np
+
+try:
+    # Optional: compiled interpreter loop for run_cycles(), from Numba or,
+    # failing that, the Cython extension built by setup.py
+    from chip8_jit import run_cycles as _run_cycles
+except ImportError:
+    try:
+        from chip8_core import run_cycles as _run_cycles
+    except ImportError:
+        _run_cycles = None
+
+# Pixels of every possible sprite byte: SPRITE_ROW_LUT[b] is the 8 bits of
+# b as 0/1 values, read left to right (most significant bit first)
+SPRITE_ROW_LUT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+
+# BCD digits (hundreds, tens, ones) of every register value, for Fx33
+BCD_LUT = tuple(bytes((v // 100, (v // 10) % 10, v % 10)) for v in range(256))
+
+
 class Chip8:
     def __init__(self):
         # Memory: 4KB (4096 bytes)
-        self.memory = [0] * 4096
+        self.memory = bytearray(4096)
 
         # 16 general-purpose 8-bit registers (V0-VF)
-        self.V = [0] * 16
+        self.V = bytearray(16)
 
         # 16-bit index register (I) - used for memory addresses
         self.I = 0
@@ -13,23 +36,74 @@ class Chip8:
         self.pc = 0x200
 
         # Stack: 16 levels of 16-bit values for subroutine return addresses
-        self.stack = [0] * 16
+        self.stack = array('H', [0] * 16)
         self.sp = 0  # Stack pointer
 
         # Timers (both count down at 60Hz when non-zero)
         self.delay_timer = 0
         self.sound_timer = 0
 
-        # Display: 64x32 pixels (monochrome)
-        self.display = [[0] * 64 for _ in range(32)]
+        # Display: 64x32 pixels (monochrome), stored row by row in one flat
+        # buffer (pixel (x, y) at index y * 64 + x) with a 2D view on top.
+        # Both are updated in place so other views of the buffer stay valid.
+        self.framebuffer = bytearray(64 * 32)
+        self.display = np.frombuffer(self.framebuffer, dtype=np.uint8).reshape(32, 64)
         self.draw_flag = False  # Set when screen needs to be redrawn
+        self.dirty_rows = 0xFFFFFFFF  # Bit per row changed since last redraw
 
         # Keypad: 16 keys (0x0-0xF)
-        self.keys = [0] * 16
+        self.keys = bytearray(16)
+
+        # Register index Fx0A is waiting to store a key press in, or None.
+        # While set, the CPU is halted until the frontend stores the key in
+        # V[waiting_for_key] and clears this.
+        self.waiting_for_key = None
+
+        # Random byte source for Cxkk
+        self._randbyte = getrandbits
 
         # Load fontset into memory (starting at 0x000)
         self._load_fontset()
 
+        # Opcode dispatch table, indexed by the first nibble. Grouped
+        # instructions map to a (mask, table) pair keyed on the remaining
+        # distinguishing bits of the opcode.
+        self._dispatch = [
+            (0xFFFF, {0x00E0: self._op_00E0, 0x00EE: self._op_00EE}),
+            self._op_1nnn, self._op_2nnn, self._op_3xkk,
+            self._op_4xkk, self._op_5xy0, self._op_6xkk, self._op_7xkk,
+            (0x000F, {
+                0x0: self._op_8xy0, 0x1: self._op_8xy1, 0x2: self._op_8xy2,
+                0x3: self._op_8xy3, 0x4: self._op_8xy4, 0x5: self._op_8xy5,
+                0x6: self._op_8xy6, 0x7: self._op_8xy7, 0xE: self._op_8xyE,
+            }),
+            self._op_9xy0, self._op_Annn, self._op_Bnnn,
+            self._op_Cxkk, self._op_Dxyn,
+            (0x00FF, {0x9E: self._op_Ex9E, 0xA1: self._op_ExA1}),
+            (0x00FF, {
+                0x07: self._op_Fx07, 0x0A: self._op_Fx0A, 0x15: self._op_Fx15,
+                0x18: self._op_Fx18, 0x1E: self._op_Fx1E, 0x29: self._op_Fx29,
+                0x33: self._op_Fx33, 0x55: self._op_Fx55, 0x65: self._op_Fx65,
+            }),
+        ]
+
+        # Pre-decoded instructions, indexed by address (None = not decoded)
+        self._decoded = [None] * 4096
+
+        # Instructions run past the last run_cycles() count by a fused pair
+        self._overshoot = 0
+
+        # NumPy views sharing storage with the state above, for sprite
+        # drawing and the compiled run_cycles() loop
+        self._memory_array = np.frombuffer(self.memory, dtype=np.uint8)
+        self._arrays = (
+            self._memory_array,
+            np.frombuffer(self.V, dtype=np.uint8),
+            np.frombuffer(self.stack, dtype=np.uint16),
+            self.display,
+            np.frombuffer(self.keys, dtype=np.uint8),
+        )
+
     def _load_fontset(self):
         """Load the built-in font sprites into memory at 0x000-0x04F.
         Each character is 5 bytes (5 rows of 8 pixels, but only 4 pixels wide).
@@ -53,31 +127,81 @@ class Chip8:
             0xF0, 0x80, 0xF0, 0x80, 0x80,  # F
         ]
 
-        for i, byte in enumerate(fontset):
-            self.memory[i] = byte
+        self.memory[0:len(fontset)] = bytes(fontset)
 
     def load_rom(self, filepath):
         """Load a ROM file into memory starting at 0x200."""
         with open(filepath, 'rb') as f:
             rom_data = f.read()
 
+        if 0x200 + len(rom_data) > 4096:
+            raise MemoryError("ROM too large to fit in memory")
+
         # Load ROM into memory starting at 0x200
-        for i, byte in enumerate(rom_data):
-            if 0x200 + i < 4096:
-                self.memory[0x200 + i] = byte
-            else:
-                raise MemoryError("ROM too large to fit in memory")
+        self.memory[0x200:0x200 + len(rom_data)] = rom_data
+
+        # Decode the whole ROM up front so cycles only dispatch
+        self._invalidate(0, 4096)
+        self._predecode(0x200, 0x200 + len(rom_data))
 
         print(f"Loaded ROM: {len(rom_data)} bytes")
 
     def cycle(self):
-        """Execute one CPU cycle: fetch, decode, execute."""
-        # Fetch: Get 2-byte opcode from memory at PC
-        # Chip8 opcodes are big-endian (high byte first)
-        opcode = (self.memory[self.pc] << 8) | self.memory[self.pc + 1]
+        """Execute one CPU cycle: fetch, decode, execute.
+
+        Returns the number of instructions executed: 2 for a fused pair,
+        0 while halted, otherwise 1.
+        """
+        if self.waiting_for_key is not None:
+            return 0  # Halted by Fx0A until a key is pressed
 
-        # Decode and execute
-        self._execute_opcode(opcode)
+        # Fetch the decoded instruction at PC, decoding it on first use
+        pc = self.pc
+        entry = self._decoded[pc]
+        if entry is None:
+            entry = self._decode(pc)
+        handler, x, y, n, nnn, kk = entry
+
+        # Default: advance PC by 2 bytes (each instruction is 2 bytes)
+        self.pc = pc + 2
+
+        # Execute; only fused pairs return their instruction count
+        return handler(x, y, n, nnn, kk) or 1
+
+    def run_cycles(self, count):
+        """Execute count CPU cycles.
+
+        Uses the compiled loop from chip8_jit (Numba) or chip8_core (Cython)
+        when one is available, falling back to calling cycle(). Either way
+        count is in instructions, so a fused pair uses up two of them.
+        """
+        if self.waiting_for_key is not None:
+            return  # Halted by Fx0A until a key is pressed
+
+        if _run_cycles is None:
+            # A fused pair can overshoot count by one instruction; take
+            # that out of the next call's budget
+            cycle = self.cycle
+            executed = self._overshoot
+            while executed < count and self.waiting_for_key is None:
+                executed += cycle()
+            self._overshoot = max(executed - count, 0)
+            return
+
+        (self.pc, self.I, self.sp, self.delay_timer, self.sound_timer,
+         draw_flag, dirty_rows, wrote_memory, waiting_for_key) = _run_cycles(
+            *self._arrays, self.pc, self.I, self.sp,
+            self.delay_timer, self.sound_timer, count)
+
+        if waiting_for_key >= 0:
+            self.waiting_for_key = waiting_for_key
+
+        if draw_flag:
+            self.draw_flag = True
+            self.dirty_rows |= dirty_rows
+        if wrote_memory:
+            # The compiled loop doesn't track the decode cache
+            self._invalidate(0, 4096)
 
     def update_timers(self):
         """Update delay and sound timers. Call this at 60Hz."""
@@ -86,195 +210,290 @@ class Chip8:
         if self.sound_timer > 0:
             self.sound_timer -= 1
 
-    def _execute_opcode(self, opcode):
-        """Decode and execute a single opcode."""
+    def _decode(self, addr):
+        """Decode the instruction at addr and cache it for later cycles.
+
+        Entries are (handler, x, y, n, nnn, kk) tuples, so the nibbles of
+        each instruction are only extracted the first time it runs.
+        """
+        # Chip8 opcodes are big-endian (high byte first)
+        memory = self.memory
+        opcode = (memory[addr] << 8) | memory[addr + 1]
+
         # Extract common opcode parts
         # nnn - 12-bit address (lowest 12 bits)
         # n   - 4-bit nibble (lowest 4 bits)
         # x   - 4-bit register index (lower 4 bits of high byte)
         # y   - 4-bit register index (upper 4 bits of low byte)
         # kk  - 8-bit constant (lowest 8 bits)
-
         nnn = opcode & 0x0FFF
         n = opcode & 0x000F
         x = (opcode & 0x0F00) >> 8
         y = (opcode & 0x00F0) >> 4
         kk = opcode & 0x00FF
 
-        # Get the first nibble to determine instruction type
-        first_nibble = opcode & 0xF000
+        # Look up the handler by the first nibble and, for the grouped
+        # instructions, by the remaining distinguishing bits
+        handler = self._dispatch[opcode >> 12]
+        if isinstance(handler, tuple):
+            mask, table = handler
+            handler = table.get(opcode & mask, self._op_nop)
 
-        # Default: advance PC by 2 bytes (each instruction is 2 bytes)
+        entry = (handler, x, y, n, nnn, kk)
+        self._decoded[addr] = entry
+        return entry
+
+    def _predecode(self, start, end):
+        """Decode every instruction between start and end ahead of time.
+
+        Common instruction pairs are then fused into a single entry that
+        performs both effects in one dispatch. The second instruction keeps
+        its own entry, so jumping into the middle of a pair still works.
+        """
+        end = min(end, 4095)
+        decode = self._decode
+        for addr in range(start, end, 2):
+            decode(addr)
+
+        decoded = self._decoded
+        for addr in range(start, end - 2, 2):
+            first = decoded[addr]
+            second = decoded[addr + 2]
+            if first[0] == self._op_Annn and second[0] == self._op_Dxyn:
+                # Annn; Dxyn -> set I then draw
+                _, x, y, n, _, _ = second
+                decoded[addr] = (self._op_Annn_Dxyn, x, y, n, first[4], 0)
+            elif (first[0] == self._op_6xkk and second[0] == self._op_7xkk
+                  and first[1] == second[1]):
+                # 6xkk; 7xkk on the same register -> one constant load
+                kk = (first[5] + second[5]) & 0xFF
+                decoded[addr] = (self._op_6xkk_7xkk, first[1], 0, 0, 0, kk)
+            elif first[0] == self._op_3xkk and second[0] == self._op_1nnn:
+                # 3xkk; 1nnn -> jump unless Vx == kk
+                decoded[addr] = (self._op_3xkk_1nnn, first[1], 0, 0,
+                                 second[4], first[5])
+
+    def _invalidate(self, start, end):
+        """Drop cached decodes overlapping memory written at start..end."""
+        # Entries starting up to three bytes earlier (a fused pair spans
+        # four bytes) also cover start
+        start = max(start - 3, 0)
+        self._decoded[start:end] = [None] * (min(end, 4096) - start)
+
+    # Opcode handlers
+    #
+    # Each handler receives the decoded opcode parts and uses the ones it
+    # needs. PC has already been advanced past the instruction.
+
+    def _op_nop(self, x, y, n, nnn, kk):
+        """Ignore opcodes with no defined behaviour."""
+        # 0nnn: SYS addr - ignored on modern interpreters
+        pass
+
+    def _op_00E0(self, x, y, n, nnn, kk):
+        # 00E0: CLS - Clear the display
+        self.display.fill(0)
+        self.dirty_rows = 0xFFFFFFFF
+        self.draw_flag = True
+
+    def _op_00EE(self, x, y, n, nnn, kk):
+        # 00EE: RET - Return from subroutine
+        self.sp -= 1
+        self.pc = self.stack[self.sp]
+
+    def _op_1nnn(self, x, y, n, nnn, kk):
+        # 1nnn: JP addr - Jump to address nnn
+        self.pc = nnn
+
+    def _op_2nnn(self, x, y, n, nnn, kk):
+        # 2nnn: CALL addr - Call subroutine at nnn
+        self.stack[self.sp] = self.pc
+        self.sp += 1
+        self.pc = nnn
+
+    def _op_3xkk(self, x, y, n, nnn, kk):
+        # 3xkk: SE Vx, byte - Skip next instruction if Vx == kk
+        if self.V[x] == kk:
+            self.pc += 2
+
+    def _op_4xkk(self, x, y, n, nnn, kk):
+        # 4xkk: SNE Vx, byte - Skip next instruction if Vx != kk
+        if self.V[x] != kk:
+            self.pc += 2
+
+    def _op_5xy0(self, x, y, n, nnn, kk):
+        # 5xy0: SE Vx, Vy - Skip next instruction if Vx == Vy
+        V = self.V
+        if V[x] == V[y]:
+            self.pc += 2
+
+    def _op_6xkk(self, x, y, n, nnn, kk):
+        # 6xkk: LD Vx, byte - Set Vx = kk
+        self.V[x] = kk
+
+    def _op_7xkk(self, x, y, n, nnn, kk):
+        # 7xkk: ADD Vx, byte - Set Vx = Vx + kk (no carry flag)
+        V = self.V
+        V[x] = (V[x] + kk) & 0xFF
+
+    def _op_8xy0(self, x, y, n, nnn, kk):
+        # 8xy0: LD Vx, Vy - Set Vx = Vy
+        V = self.V
+        V[x] = V[y]
+
+    def _op_8xy1(self, x, y, n, nnn, kk):
+        # 8xy1: OR Vx, Vy - Set Vx = Vx OR Vy
+        V = self.V
+        V[x] |= V[y]
+
+    def _op_8xy2(self, x, y, n, nnn, kk):
+        # 8xy2: AND Vx, Vy - Set Vx = Vx AND Vy
+        V = self.V
+        V[x] &= V[y]
+
+    def _op_8xy3(self, x, y, n, nnn, kk):
+        # 8xy3: XOR Vx, Vy - Set Vx = Vx XOR Vy
+        V = self.V
+        V[x] ^= V[y]
+
+    def _op_8xy4(self, x, y, n, nnn, kk):
+        # 8xy4: ADD Vx, Vy - Set Vx = Vx + Vy, VF = carry
+        V = self.V
+        result = V[x] + V[y]
+        V[0xF] = result >> 8
+        V[x] = result & 0xFF
+
+    def _op_8xy5(self, x, y, n, nnn, kk):
+        # 8xy5: SUB Vx, Vy - Set Vx = Vx - Vy, VF = NOT borrow
+        V = self.V
+        V[0xF] = 1 - ((V[x] - V[y]) >> 8 & 1)
+        V[x] = (V[x] - V[y]) & 0xFF
+
+    def _op_8xy6(self, x, y, n, nnn, kk):
+        # 8xy6: SHR Vx - Set Vx = Vx >> 1, VF = LSB before shift
+        V = self.V
+        V[0xF] = V[x] & 0x1
+        V[x] >>= 1
+
+    def _op_8xy7(self, x, y, n, nnn, kk):
+        # 8xy7: SUBN Vx, Vy - Set Vx = Vy - Vx, VF = NOT borrow
+        V = self.V
+        V[0xF] = 1 - ((V[y] - V[x]) >> 8 & 1)
+        V[x] = (V[y] - V[x]) & 0xFF
+
+    def _op_8xyE(self, x, y, n, nnn, kk):
+        # 8xyE: SHL Vx - Set Vx = Vx << 1, VF = MSB before shift
+        V = self.V
+        V[0xF] = (V[x] & 0x80) >> 7
+        V[x] = (V[x] << 1) & 0xFF
+
+    def _op_9xy0(self, x, y, n, nnn, kk):
+        # 9xy0: SNE Vx, Vy - Skip next instruction if Vx != Vy
+        V = self.V
+        if V[x] != V[y]:
+            self.pc += 2
+
+    def _op_Annn(self, x, y, n, nnn, kk):
+        # Annn: LD I, addr - Set I = nnn
+        self.I = nnn
+
+    def _op_Bnnn(self, x, y, n, nnn, kk):
+        # Bnnn: JP V0, addr - Jump to address nnn + V0
+        self.pc = nnn + self.V[0]
+
+    def _op_Cxkk(self, x, y, n, nnn, kk):
+        # Cxkk: RND Vx, byte - Set Vx = random byte AND kk
+        self.V[x] = self._randbyte(8) & kk
+
+    def _op_Dxyn(self, x, y, n, nnn, kk):
+        # Dxyn: DRW Vx, Vy, n - Draw sprite at (Vx, Vy) with height n
+        self._draw_sprite(x, y, n)
+
+    def _op_Ex9E(self, x, y, n, nnn, kk):
+        # Ex9E: SKP Vx - Skip next instruction if key Vx is pressed
+        if self.keys[self.V[x] & 0xF]:
+            self.pc += 2
+
+    def _op_ExA1(self, x, y, n, nnn, kk):
+        # ExA1: SKNP Vx - Skip next instruction if key Vx is NOT pressed
+        if not self.keys[self.V[x] & 0xF]:
+            self.pc += 2
+
+    def _op_Fx07(self, x, y, n, nnn, kk):
+        # Fx07: LD Vx, DT - Set Vx = delay timer
+        self.V[x] = self.delay_timer
+
+    def _op_Fx0A(self, x, y, n, nnn, kk):
+        # Fx0A: LD Vx, K - Wait for key press, store in Vx
+        # Halts the CPU; the key press handler stores the key and resumes
+        self.waiting_for_key = x
+
+    def _op_Fx15(self, x, y, n, nnn, kk):
+        # Fx15: LD DT, Vx - Set delay timer = Vx
+        self.delay_timer = self.V[x]
+
+    def _op_Fx18(self, x, y, n, nnn, kk):
+        # Fx18: LD ST, Vx - Set sound timer = Vx
+        self.sound_timer = self.V[x]
+
+    def _op_Fx1E(self, x, y, n, nnn, kk):
+        # Fx1E: ADD I, Vx - Set I = I + Vx
+        self.I = (self.I + self.V[x]) & 0xFFFF
+
+    def _op_Fx29(self, x, y, n, nnn, kk):
+        # Fx29: LD F, Vx - Set I = location of sprite for digit Vx
+        # Each font character is 5 bytes, stored at 0x000
+        self.I = (self.V[x] & 0xF) * 5
+
+    def _op_Fx33(self, x, y, n, nnn, kk):
+        # Fx33: LD B, Vx - Store BCD representation of Vx at I, I+1, I+2
+        I = self.I
+        if I + 3 > 4096:
+            raise IndexError("BCD digits run past the end of memory")
+        self.memory[I:I + 3] = BCD_LUT[self.V[x]]
+        self._invalidate(I, I + 3)
+
+    def _op_Fx55(self, x, y, n, nnn, kk):
+        # Fx55: LD [I], Vx - Store V0 through Vx in memory starting at I
+        I = self.I
+        if I + x + 1 > 4096:
+            raise IndexError("register block runs past the end of memory")
+        self.memory[I:I + x + 1] = self.V[:x + 1]
+        self._invalidate(I, I + x + 1)
+
+    def _op_Fx65(self, x, y, n, nnn, kk):
+        # Fx65: LD Vx, [I] - Read V0 through Vx from memory starting at I
+        I = self.I
+        if I + x + 1 > 4096:
+            raise IndexError("register block runs past the end of memory")
+        self.V[:x + 1] = self.memory[I:I + x + 1]
+
+    # Fused instruction pairs
+    #
+    # Built by _predecode; each performs two consecutive instructions,
+    # advances PC past the second one and returns how many instructions
+    # ran, for the run_cycles() budget.
+
+    def _op_Annn_Dxyn(self, x, y, n, nnn, kk):
+        # Annn; Dxyn - Set I = nnn, then draw sprite at (Vx, Vy)
+        self.pc += 2
+        self.I = nnn
+        self._draw_sprite(x, y, n)
+        return 2
+
+    def _op_6xkk_7xkk(self, x, y, n, nnn, kk):
+        # 6xkk; 7xkk - Set Vx to the sum of both constants
         self.pc += 2
+        self.V[x] = kk
+        return 2
 
-        # Decode based on first nibble
-        if first_nibble == 0x0000:
-            if opcode == 0x00E0:
-                # 00E0: CLS - Clear the display
-                self.display = [[0] * 64 for _ in range(32)]
-                self.draw_flag = True
-            elif opcode == 0x00EE:
-                # 00EE: RET - Return from subroutine
-                self.sp -= 1
-                self.pc = self.stack[self.sp]
-            else:
-                # 0nnn: SYS addr - ignored on modern interpreters
-                pass
-
-        elif first_nibble == 0x1000:
-            # 1nnn: JP addr - Jump to address nnn
-            self.pc = nnn
-
-        elif first_nibble == 0x2000:
-            # 2nnn: CALL addr - Call subroutine at nnn
-            self.stack[self.sp] = self.pc
-            self.sp += 1
-            self.pc = nnn
-
-        elif first_nibble == 0x3000:
-            # 3xkk: SE Vx, byte - Skip next instruction if Vx == kk
-            if self.V[x] == kk:
-                self.pc += 2
-
-        elif first_nibble == 0x4000:
-            # 4xkk: SNE Vx, byte - Skip next instruction if Vx != kk
-            if self.V[x] != kk:
-                self.pc += 2
-
-        elif first_nibble == 0x5000:
-            # 5xy0: SE Vx, Vy - Skip next instruction if Vx == Vy
-            if self.V[x] == self.V[y]:
-                self.pc += 2
-
-        elif first_nibble == 0x6000:
-            # 6xkk: LD Vx, byte - Set Vx = kk
-            self.V[x] = kk
-
-        elif first_nibble == 0x7000:
-            # 7xkk: ADD Vx, byte - Set Vx = Vx + kk (no carry flag)
-            self.V[x] = (self.V[x] + kk) & 0xFF
-
-        elif first_nibble == 0x8000:
-            self._execute_8xxx(opcode, x, y, n)
-
-        elif first_nibble == 0x9000:
-            # 9xy0: SNE Vx, Vy - Skip next instruction if Vx != Vy
-            if self.V[x] != self.V[y]:
-                self.pc += 2
-
-        elif first_nibble == 0xA000:
-            # Annn: LD I, addr - Set I = nnn
-            self.I = nnn
-
-        elif first_nibble == 0xB000:
-            # Bnnn: JP V0, addr - Jump to address nnn + V0
-            self.pc = nnn + self.V[0]
-
-        elif first_nibble == 0xC000:
-            # Cxkk: RND Vx, byte - Set Vx = random byte AND kk
-            import random
-            self.V[x] = random.randint(0, 255) & kk
-
-        elif first_nibble == 0xD000:
-            # Dxyn: DRW Vx, Vy, n - Draw sprite at (Vx, Vy) with height n
-            self._draw_sprite(x, y, n)
-
-        elif first_nibble == 0xE000:
-            if kk == 0x9E:
-                # Ex9E: SKP Vx - Skip next instruction if key Vx is pressed
-                if self.keys[self.V[x] & 0xF]:
-                    self.pc += 2
-            elif kk == 0xA1:
-                # ExA1: SKNP Vx - Skip next instruction if key Vx is NOT pressed
-                if not self.keys[self.V[x] & 0xF]:
-                    self.pc += 2
-
-        elif first_nibble == 0xF000:
-            self._execute_Fxxx(opcode, x, kk)
-
-        else:
-            print(f"Unknown opcode: {opcode:04X}")
-
-    def _execute_8xxx(self, opcode, x, y, n):
-        """Handle 8xxx arithmetic/logic opcodes."""
-        if n == 0x0:
-            # 8xy0: LD Vx, Vy - Set Vx = Vy
-            self.V[x] = self.V[y]
-        elif n == 0x1:
-            # 8xy1: OR Vx, Vy - Set Vx = Vx OR Vy
-            self.V[x] |= self.V[y]
-        elif n == 0x2:
-            # 8xy2: AND Vx, Vy - Set Vx = Vx AND Vy
-            self.V[x] &= self.V[y]
-        elif n == 0x3:
-            # 8xy3: XOR Vx, Vy - Set Vx = Vx XOR Vy
-            self.V[x] ^= self.V[y]
-        elif n == 0x4:
-            # 8xy4: ADD Vx, Vy - Set Vx = Vx + Vy, VF = carry
-            result = self.V[x] + self.V[y]
-            self.V[0xF] = 1 if result > 255 else 0
-            self.V[x] = result & 0xFF
-        elif n == 0x5:
-            # 8xy5: SUB Vx, Vy - Set Vx = Vx - Vy, VF = NOT borrow
-            self.V[0xF] = 1 if self.V[x] >= self.V[y] else 0
-            self.V[x] = (self.V[x] - self.V[y]) & 0xFF
-        elif n == 0x6:
-            # 8xy6: SHR Vx - Set Vx = Vx >> 1, VF = LSB before shift
-            self.V[0xF] = self.V[x] & 0x1
-            self.V[x] >>= 1
-        elif n == 0x7:
-            # 8xy7: SUBN Vx, Vy - Set Vx = Vy - Vx, VF = NOT borrow
-            self.V[0xF] = 1 if self.V[y] >= self.V[x] else 0
-            self.V[x] = (self.V[y] - self.V[x]) & 0xFF
-        elif n == 0xE:
-            # 8xyE: SHL Vx - Set Vx = Vx << 1, VF = MSB before shift
-            self.V[0xF] = (self.V[x] & 0x80) >> 7
-            self.V[x] = (self.V[x] << 1) & 0xFF
-
-    def _execute_Fxxx(self, opcode, x, kk):
-        """Handle Fxxx opcodes (timers, memory, BCD, etc.)."""
-        if kk == 0x07:
-            # Fx07: LD Vx, DT - Set Vx = delay timer
-            self.V[x] = self.delay_timer
-        elif kk == 0x0A:
-            # Fx0A: LD Vx, K - Wait for key press, store in Vx
-            # This blocks until a key is pressed
-            key_pressed = False
-            for i in range(16):
-                if self.keys[i]:
-                    self.V[x] = i
-                    key_pressed = True
-                    break
-            if not key_pressed:
-                # Repeat this instruction (don't advance PC)
-                self.pc -= 2
-        elif kk == 0x15:
-            # Fx15: LD DT, Vx - Set delay timer = Vx
-            self.delay_timer = self.V[x]
-        elif kk == 0x18:
-            # Fx18: LD ST, Vx - Set sound timer = Vx
-            self.sound_timer = self.V[x]
-        elif kk == 0x1E:
-            # Fx1E: ADD I, Vx - Set I = I + Vx
-            self.I = (self.I + self.V[x]) & 0xFFFF
-        elif kk == 0x29:
-            # Fx29: LD F, Vx - Set I = location of sprite for digit Vx
-            # Each font character is 5 bytes, stored at 0x000
-            self.I = (self.V[x] & 0xF) * 5
-        elif kk == 0x33:
-            # Fx33: LD B, Vx - Store BCD representation of Vx at I, I+1, I+2
-            value = self.V[x]
-            self.memory[self.I] = value // 100
-            self.memory[self.I + 1] = (value // 10) % 10
-            self.memory[self.I + 2] = value % 10
-        elif kk == 0x55:
-            # Fx55: LD [I], Vx - Store V0 through Vx in memory starting at I
-            for i in range(x + 1):
-                self.memory[self.I + i] = self.V[i]
-        elif kk == 0x65:
-            # Fx65: LD Vx, [I] - Read V0 through Vx from memory starting at I
-            for i in range(x + 1):
-                self.V[i] = self.memory[self.I + i]
+    def _op_3xkk_1nnn(self, x, y, n, nnn, kk):
+        # 3xkk; 1nnn - Skip the jump if Vx == kk, otherwise jump to nnn
+        if self.V[x] == kk:
+            self.pc += 2
+            return 1  # Only 3xkk ran; the jump was skipped
+        self.pc = nnn
+        return 2
 
     def _draw_sprite(self, x, y, height):
         """Draw a sprite at position (Vx, Vy) with given height.
@@ -282,28 +501,28 @@ class Chip8:
         Sprites are XORed onto the display. If any pixel is erased
         (changed from 1 to 0), VF is set to 1, otherwise 0.
         """
-        x_pos = self.V[x] % 64  # Wrap around screen
-        y_pos = self.V[y] % 32
+        V = self.V
 
-        self.V[0xF] = 0  # Reset collision flag
+        x_pos = V[x] % 64  # Wrap around screen
+        y_pos = V[y] % 32
 
-        for row in range(height):
-            if y_pos + row >= 32:
-                break  # Stop if we go off screen
+        # Clip sprites that run off the right or bottom edge of the screen
+        width = min(8, 64 - x_pos)
+        rows = min(height, 32 - y_pos)
 
-            sprite_byte = self.memory[self.I + row]
+        # Sprite data must fit in memory, as with the compiled loops
+        if self.I + rows > 4096:
+            raise IndexError("sprite data runs past the end of memory")
 
-            for col in range(8):
-                if x_pos + col >= 64:
-                    break  # Stop if we go off screen
+        self.dirty_rows |= ((1 << rows) - 1) << y_pos
 
-                # Check if sprite pixel is on (read bits left to right)
-                sprite_pixel = (sprite_byte >> (7 - col)) & 0x1
+        # Look up the pixels of every sprite row at once
+        sprite = self._memory_array[self.I:self.I + rows]
+        sprite_bits = SPRITE_ROW_LUT[sprite, :width]
+        pixels = self.display[y_pos:y_pos + rows, x_pos:x_pos + width]
 
-                if sprite_pixel:
-                    # XOR with current display pixel
-                    if self.display[y_pos + row][x_pos + col] == 1:
-                        self.V[0xF] = 1  # Collision detected
-                    self.display[y_pos + row][x_pos + col] ^= 1
+        # XOR the whole sprite onto the display; VF = collision
+        V[0xF] = 1 if (pixels & sprite_bits).any() else 0
+        pixels ^= sprite_bits
 
-        self.draw_flag = True
\ No newline at end of file
+        self.draw_flag = True
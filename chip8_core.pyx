@@ -0,0 +1,226 @@
+# cython: language_level=3
+"""Cython-compiled Chip8 interpreter loop.
+
+A C fallback for chip8_jit when Numba isn't installed. run_cycles has the
+same signature and return value as chip8_jit.run_cycles and works on the
+same shared state arrays. Build it in place with:
+
+    python setup.py build_ext --inplace
+"""
+from libc.stdlib cimport rand
+
+
+cdef inline unsigned int _draw_sprite(unsigned char[::1] memory,
+                                      unsigned char[::1] V,
+                                      unsigned char[:, ::1] display,
+                                      long I, int x, int y, int height):
+    """Draw a sprite at position (Vx, Vy) with given height.
+
+    Sprites are XORed onto the display. If any pixel is erased
+    (changed from 1 to 0), VF is set to 1, otherwise 0.
+
+    Returns a bitmask of the display rows the sprite covers.
+    """
+    cdef int x_pos = V[x] % 64  # Wrap around screen
+    cdef int y_pos = V[y] % 32
+    cdef int row, col
+    cdef unsigned char sprite_byte
+
+    V[0xF] = 0  # Reset collision flag
+
+    for row in range(height):
+        if y_pos + row >= 32:
+            break  # Stop if we go off screen
+
+        sprite_byte = memory[I + row]
+
+        for col in range(8):
+            if x_pos + col >= 64:
+                break  # Stop if we go off screen
+
+            # Check if sprite pixel is on (read bits left to right)
+            if (sprite_byte >> (7 - col)) & 0x1:
+                # XOR with current display pixel
+                if display[y_pos + row, x_pos + col] == 1:
+                    V[0xF] = 1  # Collision detected
+                display[y_pos + row, x_pos + col] ^= 1
+
+    return ((1u << min(height, 32 - y_pos)) - 1) << y_pos
+
+
+cdef inline void _execute_8xxx(unsigned char[::1] V, int x, int y, int n):
+    """Handle 8xxx arithmetic/logic opcodes."""
+    cdef int result
+    if n == 0x0:
+        # 8xy0: LD Vx, Vy - Set Vx = Vy
+        V[x] = V[y]
+    elif n == 0x1:
+        # 8xy1: OR Vx, Vy - Set Vx = Vx OR Vy
+        V[x] |= V[y]
+    elif n == 0x2:
+        # 8xy2: AND Vx, Vy - Set Vx = Vx AND Vy
+        V[x] &= V[y]
+    elif n == 0x3:
+        # 8xy3: XOR Vx, Vy - Set Vx = Vx XOR Vy
+        V[x] ^= V[y]
+    elif n == 0x4:
+        # 8xy4: ADD Vx, Vy - Set Vx = Vx + Vy, VF = carry
+        result = V[x] + V[y]
+        V[0xF] = result >> 8
+        V[x] = result & 0xFF
+    elif n == 0x5:
+        # 8xy5: SUB Vx, Vy - Set Vx = Vx - Vy, VF = NOT borrow
+        V[0xF] = 1 - ((<int>V[x] - V[y]) >> 8 & 1)
+        V[x] = (<int>V[x] - V[y]) & 0xFF
+    elif n == 0x6:
+        # 8xy6: SHR Vx - Set Vx = Vx >> 1, VF = LSB before shift
+        V[0xF] = V[x] & 0x1
+        V[x] >>= 1
+    elif n == 0x7:
+        # 8xy7: SUBN Vx, Vy - Set Vx = Vy - Vx, VF = NOT borrow
+        V[0xF] = 1 - ((<int>V[y] - V[x]) >> 8 & 1)
+        V[x] = (<int>V[y] - V[x]) & 0xFF
+    elif n == 0xE:
+        # 8xyE: SHL Vx - Set Vx = Vx << 1, VF = MSB before shift
+        V[0xF] = (V[x] & 0x80) >> 7
+        V[x] = (V[x] << 1) & 0xFF
+
+
+def run_cycles(unsigned char[::1] memory, unsigned char[::1] V,
+               unsigned short[::1] stack, unsigned char[:, ::1] display,
+               unsigned char[::1] keys, long pc, long I, long sp,
+               long delay, long sound, long count):
+    """Execute count CPU cycles.
+
+    Returns the updated (pc, I, sp, delay, sound, draw_flag, dirty_rows,
+    wrote_memory, waiting_for_key), where dirty_rows has a bit set for
+    every display row changed. An Fx0A stops the batch early and sets
+    waiting_for_key to its register index; it is -1 otherwise.
+    """
+    cdef bint draw_flag = False
+    cdef bint wrote_memory = False
+    cdef unsigned int dirty_rows = 0
+    cdef int waiting_for_key = -1
+    cdef long step
+    cdef int opcode, nnn, n, x, y, kk, first_nibble
+
+    for step in range(count):
+        # Fetch: Chip8 opcodes are big-endian (high byte first)
+        opcode = (memory[pc] << 8) | memory[pc + 1]
+
+        nnn = opcode & 0x0FFF
+        n = opcode & 0x000F
+        x = (opcode & 0x0F00) >> 8
+        y = (opcode & 0x00F0) >> 4
+        kk = opcode & 0x00FF
+        first_nibble = opcode >> 12
+
+        # Default: advance PC by 2 bytes (each instruction is 2 bytes)
+        pc += 2
+
+        # Cython compiles this if/elif chain on one integer to a C switch
+        if first_nibble == 0x0:
+            if opcode == 0x00E0:
+                # 00E0: CLS - Clear the display
+                display[:, :] = 0
+                dirty_rows = 0xFFFFFFFF
+                draw_flag = True
+            elif opcode == 0x00EE:
+                # 00EE: RET - Return from subroutine
+                sp -= 1
+                pc = stack[sp]
+        elif first_nibble == 0x1:
+            # 1nnn: JP addr - Jump to address nnn
+            pc = nnn
+        elif first_nibble == 0x2:
+            # 2nnn: CALL addr - Call subroutine at nnn
+            stack[sp] = pc
+            sp += 1
+            pc = nnn
+        elif first_nibble == 0x3:
+            # 3xkk: SE Vx, byte - Skip next instruction if Vx == kk
+            if V[x] == kk:
+                pc += 2
+        elif first_nibble == 0x4:
+            # 4xkk: SNE Vx, byte - Skip next instruction if Vx != kk
+            if V[x] != kk:
+                pc += 2
+        elif first_nibble == 0x5:
+            # 5xy0: SE Vx, Vy - Skip next instruction if Vx == Vy
+            if V[x] == V[y]:
+                pc += 2
+        elif first_nibble == 0x6:
+            # 6xkk: LD Vx, byte - Set Vx = kk
+            V[x] = kk
+        elif first_nibble == 0x7:
+            # 7xkk: ADD Vx, byte - Set Vx = Vx + kk (no carry flag)
+            V[x] = (V[x] + kk) & 0xFF
+        elif first_nibble == 0x8:
+            _execute_8xxx(V, x, y, n)
+        elif first_nibble == 0x9:
+            # 9xy0: SNE Vx, Vy - Skip next instruction if Vx != Vy
+            if V[x] != V[y]:
+                pc += 2
+        elif first_nibble == 0xA:
+            # Annn: LD I, addr - Set I = nnn
+            I = nnn
+        elif first_nibble == 0xB:
+            # Bnnn: JP V0, addr - Jump to address nnn + V0
+            pc = nnn + V[0]
+        elif first_nibble == 0xC:
+            # Cxkk: RND Vx, byte - Set Vx = random byte AND kk
+            V[x] = rand() & kk
+        elif first_nibble == 0xD:
+            # Dxyn: DRW Vx, Vy, n - Draw sprite at (Vx, Vy) with height n
+            dirty_rows |= _draw_sprite(memory, V, display, I, x, y, n)
+            draw_flag = True
+        elif first_nibble == 0xE:
+            if kk == 0x9E:
+                # Ex9E: SKP Vx - Skip next instruction if key Vx is pressed
+                if keys[V[x] & 0xF]:
+                    pc += 2
+            elif kk == 0xA1:
+                # ExA1: SKNP Vx - Skip next instruction if key Vx is NOT pressed
+                if not keys[V[x] & 0xF]:
+                    pc += 2
+        else:
+            if kk == 0x07:
+                # Fx07: LD Vx, DT - Set Vx = delay timer
+                V[x] = delay
+            elif kk == 0x0A:
+                # Fx0A: LD Vx, K - Wait for key press, store in Vx
+                # Halts the CPU; the key press handler stores the key and resumes
+                waiting_for_key = x
+                break
+            elif kk == 0x15:
+                # Fx15: LD DT, Vx - Set delay timer = Vx
+                delay = V[x]
+            elif kk == 0x18:
+                # Fx18: LD ST, Vx - Set sound timer = Vx
+                sound = V[x]
+            elif kk == 0x1E:
+                # Fx1E: ADD I, Vx - Set I = I + Vx
+                I = (I + V[x]) & 0xFFFF
+            elif kk == 0x29:
+                # Fx29: LD F, Vx - Set I = location of sprite for digit Vx
+                I = (V[x] & 0xF) * 5
+            elif kk == 0x33:
+                # Fx33: LD B, Vx - Store BCD representation of Vx at I, I+1, I+2
+                memory[I] = V[x] // 100
+                memory[I + 1] = (V[x] // 10) % 10
+                memory[I + 2] = V[x] % 10
+                wrote_memory = True
+            elif kk == 0x55:
+                # Fx55: LD [I], Vx - Store V0 through Vx in memory starting at I
+                if I + x + 1 > 4096:
+                    raise IndexError("register block runs past the end of memory")
+                memory[I:I + x + 1] = V[:x + 1]
+                wrote_memory = True
+            elif kk == 0x65:
+                # Fx65: LD Vx, [I] - Read V0 through Vx from memory starting at I
+                if I + x + 1 > 4096:
+                    raise IndexError("register block runs past the end of memory")
+                V[:x + 1] = memory[I:I + x + 1]
+
+    return (pc, I, sp, delay, sound, draw_flag, dirty_rows, wrote_memory,
+            waiting_for_key)
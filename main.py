@@ -1,5 +1,6 @@
 import pygame
 import sys
+import time
 from Chip8 import Chip8
 
 # Display scaling (64x32 native, scaled up for visibility)
@@ -7,6 +8,25 @@ SCALE = 10
 SCREEN_WIDTH = 64 * SCALE
 SCREEN_HEIGHT = 32 * SCALE
 
+# Timers (and the display) run at 60Hz. The CPU runs at its own CPU_HZ
+# instructions per second: each frame it catches up to the current time in
+# batches of CYCLE_BATCH, stopping early if the frame's time (less
+# RENDER_MARGIN seconds for drawing) runs out.
+TIMER_HZ = 60
+CPU_HZ = 600  # Adjust for speed (higher = faster)
+CYCLE_BATCH = 64
+RENDER_MARGIN = 0.002
+
+# Per-row rects, built once: each display row in the 64x32 framebuffer
+# surface and the screen area it is scaled onto
+LINE_RECTS = [pygame.Rect(0, row, 64, 1) for row in range(32)]
+ROW_RECTS = [pygame.Rect(0, row * SCALE, SCREEN_WIDTH, SCALE) for row in range(32)]
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+# With at least this many dirty rows, one full-screen scale is cheaper
+# than scaling the rows one by one
+FULL_REDRAW_ROWS = 28
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -24,14 +44,57 @@ KEY_MAP = {
     pygame.K_z: 0xA, pygame.K_x: 0x0, pygame.K_c: 0xB, pygame.K_v: 0xF,
 }
 
+# KEY_MAP as a dense list indexed by pygame key code (-1 = unmapped)
+KEY_LUT = [KEY_MAP.get(code, -1) for code in range(max(KEY_MAP) + 1)]
+
+
+def make_display_surfaces(chip8):
+    """Create the surfaces draw_display renders through, all built once.
+
+    Returns (surface, scaled, lines, scaled_rows): a 64x32 8-bit surface
+    sharing the Chip8 framebuffer, a screen-sized 8-bit surface it is
+    scaled into, and the per-row subsurfaces of each. Pixel values 0/1
+    index a BLACK/WHITE palette, so the surface always shows the current
+    display without copying.
+    """
+    surface = pygame.image.frombuffer(chip8.framebuffer, (64, 32), 'P')
+    surface.set_palette([BLACK, WHITE])
+
+    # transform.scale can only scale into a surface of the same format
+    scaled = pygame.Surface(SCREEN_RECT.size, 0, surface)
+    scaled.set_palette([BLACK, WHITE])
+
+    lines = [surface.subsurface(rect) for rect in LINE_RECTS]
+    scaled_rows = [scaled.subsurface(rect) for rect in ROW_RECTS]
+    return surface, scaled, lines, scaled_rows
+
+
+def draw_display(screen, chip8, surfaces):
+    """Render the rows of the Chip8 display changed since the last redraw.
 
-def draw_display(screen, chip8):
-    """Render the Chip8 display to the pygame window."""
-    for y in range(32):
-        for x in range(64):
-            color = WHITE if chip8.display[y][x] else BLACK
-            rect = pygame.Rect(x * SCALE, y * SCALE, SCALE, SCALE)
-            pygame.draw.rect(screen, color, rect)
+    Returns the list of screen rects that were redrawn.
+    """
+    surface, scaled, lines, scaled_rows = surfaces
+    dirty_rows = chip8.dirty_rows
+    chip8.dirty_rows = 0
+
+    if bin(dirty_rows).count('1') >= FULL_REDRAW_ROWS:
+        # First frame, CLS or a mostly changed screen: redraw it all
+        pygame.transform.scale(surface, SCREEN_RECT.size, scaled)
+        screen.blit(scaled, SCREEN_RECT)
+        return [SCREEN_RECT]
+
+    rects = []
+    for row in range(32):
+        if not (dirty_rows >> row) & 1:
+            continue  # Row unchanged since the last redraw
+
+        rect = ROW_RECTS[row]
+        pygame.transform.scale(lines[row], rect.size, scaled_rows[row])
+        screen.blit(scaled, rect, rect)
+        rects.append(rect)
+
+    return rects
 
 
 def main():
@@ -46,15 +109,19 @@ def main():
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption(f"Chip8 Emulator - {rom_path}")
-    clock = pygame.time.Clock()
 
     # Initialize Chip8
     chip8 = Chip8()
     chip8.load_rom(rom_path)
 
+    # Native-resolution view of the display, scaled up on every redraw
+    surfaces = make_display_surfaces(chip8)
+
     # Main emulation loop
     running = True
-    cycles_per_frame = 10  # Adjust for speed (higher = faster)
+    frame_time = 1 / TIMER_HZ
+    cpu_time = time.perf_counter()  # Time the CPU has been run up to
+    next_timer_tick = cpu_time + frame_time
 
     while running:
         # Handle events
@@ -64,23 +131,34 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
-                elif event.key in KEY_MAP:
-                    chip8.keys[KEY_MAP[event.key]] = 1
+                elif event.key < len(KEY_LUT) and (key := KEY_LUT[event.key]) >= 0:
+                    chip8.keys[key] = 1
+                    if chip8.waiting_for_key is not None:
+                        # Resume an Fx0A waiting for this key press
+                        chip8.V[chip8.waiting_for_key] = key
+                        chip8.waiting_for_key = None
             elif event.type == pygame.KEYUP:
-                if event.key in KEY_MAP:
-                    chip8.keys[KEY_MAP[event.key]] = 0
-
-        # Execute CPU cycles
-        for _ in range(cycles_per_frame):
-            chip8.cycle()
-
-        # Update timers at 60Hz
-        chip8.update_timers()
+                if event.key < len(KEY_LUT) and (key := KEY_LUT[event.key]) >= 0:
+                    chip8.keys[key] = 0
+
+        # Execute the CPU cycles due since the last frame at CPU_HZ, until
+        # they are done or the frame's time is spent
+        now = time.perf_counter()
+        if now - cpu_time > 0.25:
+            cpu_time = now  # Fell far behind; don't try to catch up
+        due = int((now - cpu_time) * CPU_HZ)
+        cpu_deadline = next_timer_tick - RENDER_MARGIN
+        while due > 0:
+            batch = min(CYCLE_BATCH, due)
+            chip8.run_cycles(batch)
+            due -= batch
+            cpu_time += batch / CPU_HZ
+            if time.perf_counter() >= cpu_deadline:
+                break
 
         # Render display if needed
         if chip8.draw_flag:
-            draw_display(screen, chip8)
-            pygame.display.flip()
+            pygame.display.update(draw_display(screen, chip8, surfaces))
             chip8.draw_flag = False
 
         # Play beep if sound timer is active
@@ -88,8 +166,18 @@ def main():
         if chip8.sound_timer > 0:
             pass  # Beep!
 
-        # Cap at 60 FPS (timers run at 60Hz)
-        clock.tick(60)
+        # Sleep out the rest of the frame; this is the only frame pacing
+        remaining = next_timer_tick - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+        # Update timers at 60Hz of wall-clock time, whatever the CPU rate
+        now = time.perf_counter()
+        if now - next_timer_tick > 0.25:
+            next_timer_tick = now  # Fell far behind; don't try to catch up
+        while now >= next_timer_tick:
+            chip8.update_timers()
+            next_timer_tick += frame_time
 
     pygame.quit()
 
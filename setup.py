@@ -0,0 +1,13 @@
+"""Build the optional Cython interpreter loop (chip8_core).
+
+    python setup.py build_ext --inplace
+"""
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+setup(
+    name="chip8",
+    ext_modules=cythonize(
+        [Extension("chip8_core", ["chip8_core.pyx"], extra_compile_args=["-O3"])],
+    ),
+)
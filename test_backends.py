@@ -0,0 +1,218 @@
+"""Check the compiled run_cycles loops against the Python interpreter.
+
+chip8_jit and chip8_core each carry their own copy of the opcode
+semantics; these tests run the same ROMs through Chip8.cycle() and every
+compiled backend that is installed, and compare the resulting state.
+Run with:
+
+    python -m unittest test_backends
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import Chip8
+
+try:
+    import chip8_jit
+except ImportError:
+    chip8_jit = None
+
+try:
+    import chip8_core
+except ImportError:
+    chip8_core = None
+
+
+def _addr(index):
+    """Address of the instruction at index in a ROM."""
+    return 0x200 + 2 * index
+
+
+# Exercises every deterministic opcode (all but Cxkk and Fx0A), including
+# the pairs Chip8._predecode fuses, and ends in a jump to itself
+PROGRAM = [
+    0x00E0,          # 00: CLS
+    0x6005, 0x7003,  # 01: V0 = 5; V0 += 3 (fused)
+    0x6112,          # 03: V1 = 0x12
+    0xA300, 0xD015,  # 04: I = 0x300; draw 5 rows at (V0, V1) (fused)
+    0xF029, 0xD105,  # 06: I = font digit V0; draw it at (V1, V0)
+    0xD10F,          # 08: draw it again, 15 rows, clipped at the bottom
+    0xA320,          # 09: I = 0x320
+    0x62C8, 0xF233,  # 0A: V2 = 200; BCD of V2 at I
+    0xF265,          # 0C: V0..V2 = memory[I..I+2]
+    0x63F0, 0x640F,  # 0D: V3 = 0xF0; V4 = 0x0F
+    0x8341, 0x8432, 0x8343,          # 0F: OR, AND, XOR
+    0x8344, 0x8AF0,  # 12: ADD; VA = carry
+    0x8345, 0x8BF0,  # 14: SUB; VB = NOT borrow
+    0x8346, 0x8CF0,  # 16: SHR; VC = bit shifted out
+    0x8347, 0x8DF0,  # 18: SUBN; VD = NOT borrow
+    0x834E, 0x8EF0,  # 1A: SHL; VE = bit shifted out
+    0x8F30, 0x8FF4, 0x83F5,          # 1C: with VF as an operand
+    0x8530,          # 1F: V5 = V3
+    0xF31E,          # 20: I += V3
+    0xF555,          # 21: memory[I..I+5] = V0..V5
+    0x6500,          # 22: V5 = 0
+    0x2000 | _addr(0x40),            # 23: CALL sub
+    0x3508, 0x1000 | _addr(0x23),    # 24: loop to 23 until V5 == 8 (fused)
+    0x4508, 0x6601,  # 26: SNE V5, 8 (no skip); V6 = 1
+    0x5560, 0x6602,  # 28: SE V5, V6 (no skip); V6 = 2
+    0x9560, 0x6603,  # 2A: SNE V5, V6 (skips)
+    0x6705, 0xE79E,  # 2C: V7 = 5; skip if key 5 is pressed
+    0x6801,          # 2E: (skipped)
+    0xE7A1, 0x6802,  # 2F: skip if key 5 is not pressed (no skip); V8 = 2
+    0xF515, 0xF618,  # 31: delay timer = V5; sound timer = V6
+    0xF907,          # 33: V9 = delay timer
+    0x6002,          # 34: V0 = 2
+    0xB000 | _addr(0x35),            # 35: jump V0 = 2 bytes on, to 36
+    0x0123,          # 36: SYS (ignored)
+    0xAFF8, 0xF765,  # 37: I = 0xFF8; V0..V7 = the last 8 bytes of memory
+    0x1000 | _addr(0x39),            # 39: halt
+] + [0x0000] * (0x40 - 0x3A) + [
+    0x7501, 0x00EE,  # 40: sub: V5 += 1; RET
+]
+HALT = _addr(0x39)
+
+SPRITE = bytes([0x3C, 0x42, 0x81, 0xFF, 0x18])  # At 0x300
+
+
+def _random_rom(rng):
+    """Random ROM of deterministic opcodes (no Cxkk or Fx0A).
+
+    I only ever points into the fonts or at 0xE00 upwards (there is no
+    Fx1E), so the program never overwrites its own code. It ends in two
+    jumps to themselves, as a skip can pass over the first.
+    """
+    length = rng.randrange(8, 48)
+    ops = []
+    for _ in range(length):
+        x, y, kk = rng.randrange(16), rng.randrange(16), rng.randrange(256)
+        kind = rng.randrange(14)
+        if kind == 0:
+            op = rng.choice([0x00E0, 0x0123])
+        elif kind == 1:
+            op = rng.choice([0x1000, 0x2000]) | _addr(rng.randrange(length))
+        elif kind in (2, 3, 4):
+            op = (rng.choice([3, 4, 6, 7]) << 12) | (x << 8) | kk
+        elif kind == 5:
+            op = 0x5000 | (x << 8) | (y << 4)
+        elif kind == 6:
+            op = 0x8000 | (x << 8) | (y << 4) | rng.choice([0, 1, 2, 3, 4, 5, 6, 7, 0xE])
+        elif kind == 7:
+            op = 0x9000 | (x << 8) | (y << 4)
+        elif kind == 8:
+            op = 0xA000 | rng.choice([rng.randrange(0x50), rng.randrange(0xE00, 0xF00)])
+        elif kind == 9:
+            op = 0xD000 | (x << 8) | (y << 4) | rng.randrange(16)
+        elif kind == 10:
+            op = 0xE000 | (x << 8) | rng.choice([0x9E, 0xA1])
+        else:
+            op = 0xF000 | (x << 8) | rng.choice([0x07, 0x15, 0x18, 0x29, 0x33, 0x55, 0x65])
+        ops.append(op)
+
+        # Fused pairs
+        if rng.random() < 0.1:
+            ops += [0x6000 | x << 8 | kk, 0x7000 | x << 8 | rng.randrange(256)]
+        elif rng.random() < 0.1:
+            ops += [0xA000 | rng.randrange(0x50), 0xD000 | (x << 8) | (y << 4) | 5]
+        elif rng.random() < 0.1:
+            ops += [0x3000 | x << 8 | rng.randrange(4), 0x1000 | _addr(rng.randrange(length))]
+
+    ops += [0x1000 | _addr(len(ops)), 0x1000 | _addr(len(ops) + 1)]
+    return b''.join(op.to_bytes(2, 'big') for op in ops)
+
+
+def _load(rom, data=()):
+    """Return a Chip8 with rom loaded, (address, bytes) data and key 5 down."""
+    chip8 = Chip8.Chip8()
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(rom)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            chip8.load_rom(f.name)
+    finally:
+        os.unlink(f.name)
+
+    for address, values in data:
+        chip8.memory[address:address + len(values)] = values
+    chip8.keys[5] = 1
+    chip8.dirty_rows = 0
+    return chip8
+
+
+def _state(chip8):
+    return (
+        chip8.pc, chip8.I, chip8.sp, bytes(chip8.V), bytes(chip8.stack),
+        bytes(chip8.memory), bytes(chip8.framebuffer), chip8.delay_timer,
+        chip8.sound_timer, chip8.draw_flag, chip8.dirty_rows,
+        chip8.waiting_for_key,
+    )
+
+
+def _run(chip8, backend, budgets):
+    """Run chip8.run_cycles() over budgets with the given compiled loop.
+
+    Returns the final state, or the type of the exception raised.
+    """
+    with mock.patch.object(Chip8, '_run_cycles', backend):
+        try:
+            for count in budgets:
+                chip8.run_cycles(count)
+        except (IndexError, ValueError) as e:
+            return type(e)
+    return _state(chip8)
+
+
+class BackendParityTest:
+    """Compare one compiled run_cycles loop with the Python interpreter."""
+
+    backend = None
+
+    def assert_same(self, rom, budgets, data=()):
+        reference = _load(rom, data)
+        expected = _run(reference, None, budgets)
+
+        # A fused pair can end the Python run one instruction past the
+        # budget; the compiled loop catches up with one more instruction
+        if not isinstance(expected, type) and reference._overshoot:
+            budgets = budgets + [reference._overshoot]
+
+        actual = _run(_load(rom, data), self.backend.run_cycles, budgets)
+        self.assertEqual(actual, expected)
+
+    def test_program(self):
+        rom = b''.join(op.to_bytes(2, 'big') for op in PROGRAM)
+        data = [(0x300, SPRITE)]
+        state = _run(_load(rom, data), None, [500])
+        self.assertIsInstance(state, tuple)  # Didn't raise
+        self.assertEqual(state[0], HALT)
+
+        for budgets in ([500], [1] * 300, [10] * 50, [7, 3, 64, 1, 2] * 20):
+            with self.subTest(budgets=budgets[:5]):
+                self.assert_same(rom, budgets, data)
+
+    def test_random_roms(self):
+        rng = random.Random(0)
+        for seed in range(500):
+            rom = _random_rom(rng)
+            budgets = [rng.randrange(1, 20) for _ in range(rng.randrange(1, 40))]
+            with self.subTest(seed=seed):
+                self.assert_same(rom, budgets)
+
+
+@unittest.skipIf(chip8_jit is None, "Numba is not installed")
+class NumbaParityTest(BackendParityTest, unittest.TestCase):
+    backend = chip8_jit
+
+
+@unittest.skipIf(chip8_core is None, "chip8_core extension is not built")
+class CythonParityTest(BackendParityTest, unittest.TestCase):
+    backend = chip8_core
+
+
+if __name__ == '__main__':
+    unittest.main()